@@ -1,14 +1,35 @@
 import os
+import platform
 
-from collections import defaultdict
 from datetime import datetime
+from operator import itemgetter
 from dotenv import load_dotenv
 
 from tricount_api import TricountAPI
 
+np = None
+njit = None
+if platform.python_implementation() != "PyPy":
+    # on PyPy the tracing JIT makes the plain loop the fastest path, so the
+    # numpy/numba acceleration is CPython-only
+    try:
+        import numpy as np
+    except ImportError:
+        # numpy is optional; without it the pure-Python loop below is used
+        pass
+    try:
+        from numba import njit
+    except ImportError:
+        # numba is optional on top of numpy; without it the bincount path is used
+        pass
+
 # currency symbol/code to use in print output
 CURRENCY = "EUR"
 
+# set TRICOUNT_DEBUG=1 to warn when an entry's allocations do not sum to its
+# amount; off by default to keep the row loop free of the check and the I/O
+DEBUG_CONSISTENCY = os.getenv("TRICOUNT_DEBUG") == "1"
+
 def _parse_date(date_str: str):
     if not date_str:
         return None
@@ -21,13 +42,12 @@ def _parse_date(date_str: str):
 
 
 def _get_display_name(membership_block: dict) -> str:
-    return (
-        membership_block
-        .get("RegistryMembershipNonUser", {})
-        .get("alias", {})
-        .get("display_name")
-        or "Unbekannt"
-    )
+    # direct indexing: the happy path is nearly all calls, and chained .get()
+    # would allocate a fresh {} default per level
+    try:
+        return membership_block["RegistryMembershipNonUser"]["alias"]["display_name"] or "Unbekannt"
+    except (KeyError, TypeError):
+        return "Unbekannt"
 
 
 def _get_amount(entry_or_alloc: dict) -> float:
@@ -36,17 +56,252 @@ def _get_amount(entry_or_alloc: dict) -> float:
     Missing/invalid values -> 0.0
     """
     try:
-        v = entry_or_alloc.get("amount_local", {}).get("value", None)
-        if v is None:
-            v = entry_or_alloc.get("amount", {}).get("value", 0)
-        return float(v)
-    except (TypeError, ValueError):
+        return float(entry_or_alloc["amount_local"]["value"])
+    except (KeyError, TypeError, ValueError):
+        pass
+    try:
+        return float(entry_or_alloc["amount"]["value"])
+    except (KeyError, TypeError, ValueError):
         return 0.0
 
 
+# memoized flatten result: holds the data dict itself (keeping it alive, so
+# the identity check stays valid) alongside its arrays; update_data()
+# replaces the dict wholesale, which misses the `is` comparison
+_flat_cache = (None, None)
+
+
+def _flatten_entries(data):
+    """
+    Flatten the registry entries once into parallel numpy arrays
+    (struct-of-arrays) so month breakdowns run as vectorized aggregations
+    instead of per-row dict traversal.
+
+    Returns a dict of arrays over ACTIVE, non-zero entries:
+      - months, amounts, categories, payers, ids (one element per entry)
+      - alloc_entry, alloc_amounts, alloc_names (one element per allocation,
+        alloc_entry holding the owning entry's index)
+      - alloc_sums, has_alloc (per entry, for the consistency check)
+      - cat_ids, person_ids, month_ids, alloc_name_ids: the same columns
+        interned as small integer ids (with cat_names/person_names/
+        month_lookup to map back), so the numba kernel can aggregate into
+        flat buffers without touching Python strings
+    """
+    global _flat_cache
+
+    if _flat_cache[0] is data:
+        return _flat_cache[1]
+
+    response = data.get("Response", [])
+    entries = (response[0].get("Registry", {}).get("all_registry_entry", []) or []) if response else []
+
+    months, amounts, categories, payers, ids = [], [], [], [], []
+    alloc_entry, alloc_amounts, alloc_names = [], [], []
+    alloc_sums, has_alloc = [], []
+
+    # string -> id interning (done in plain Python dicts; numba's typed
+    # dict is much slower for this)
+    cat_lookup, person_lookup, month_lookup = {}, {}, {}
+    cat_ids, person_ids, month_ids, alloc_name_ids = [], [], [], []
+
+    def _intern(name, lookup):
+        i = lookup.get(name)
+        if i is None:
+            i = lookup[name] = len(lookup)
+        return i
+
+    # amount fields are consistent within one registry, so resolve whether
+    # amount_local or amount applies from the first row that has either and
+    # probe only that path afterwards; _get_amount stays as the fallback
+    # for oddball rows
+    amount_key = None
+    alloc_amount_key = None
+
+    for wrapper in entries:
+        entry = wrapper.get("RegistryEntry") if wrapper else None
+        if not entry:
+            continue
+
+        if entry.get("status") and entry["status"] != "ACTIVE":
+            continue
+
+        if amount_key is None:
+            if entry.get("amount_local") is not None:
+                amount_key = "amount_local"
+            elif entry.get("amount") is not None:
+                amount_key = "amount"
+        try:
+            amount_val = float(entry[amount_key]["value"])
+        except (KeyError, TypeError, ValueError):
+            amount_val = _get_amount(entry)
+        if amount_val == 0:
+            continue
+
+        date_str = entry.get("date") or ""
+        prefix = date_str[:7]
+        if not (len(prefix) == 7 and prefix[4] == "-" and prefix[:4].isdigit() and prefix[5:].isdigit()):
+            dt = _parse_date(date_str)
+            prefix = dt.strftime("%Y-%m") if dt else ""
+
+        idx = len(amounts)
+        category = entry.get("category_custom") or entry.get("category") or "Unbekannt"
+        payer = _get_display_name(entry.get("membership_owned"))
+        months.append(prefix)
+        amounts.append(amount_val)
+        categories.append(category)
+        payers.append(payer)
+        ids.append(entry.get("id"))
+        cat_ids.append(_intern(category, cat_lookup))
+        person_ids.append(_intern(payer, person_lookup))
+        month_ids.append(_intern(prefix, month_lookup))
+
+        alloc_sum = 0.0
+        allocations = entry.get("allocations") or ()
+        for alloc in allocations:
+            if alloc_amount_key is None:
+                if alloc.get("amount_local") is not None:
+                    alloc_amount_key = "amount_local"
+                elif alloc.get("amount") is not None:
+                    alloc_amount_key = "amount"
+            try:
+                a = float(alloc[alloc_amount_key]["value"])
+            except (KeyError, TypeError, ValueError):
+                a = _get_amount(alloc)
+            alloc_sum += a
+            if a == 0:
+                continue
+            name = _get_display_name(alloc.get("membership"))
+            alloc_entry.append(idx)
+            alloc_amounts.append(a)
+            alloc_names.append(name)
+            alloc_name_ids.append(_intern(name, person_lookup))
+        alloc_sums.append(alloc_sum)
+        has_alloc.append(bool(allocations))
+
+    flat = {
+        "months": np.array(months, dtype="U7"),
+        "amounts": np.array(amounts, dtype=np.float64),
+        "categories": np.array(categories, dtype=object),
+        "payers": np.array(payers, dtype=object),
+        "ids": ids,
+        "alloc_entry": np.array(alloc_entry, dtype=np.intp),
+        "alloc_amounts": np.array(alloc_amounts, dtype=np.float64),
+        "alloc_names": np.array(alloc_names, dtype=object),
+        "alloc_sums": np.array(alloc_sums, dtype=np.float64),
+        "has_alloc": np.array(has_alloc, dtype=bool),
+        "cat_ids": np.array(cat_ids, dtype=np.int64),
+        "person_ids": np.array(person_ids, dtype=np.int64),
+        "month_ids": np.array(month_ids, dtype=np.int64),
+        "alloc_name_ids": np.array(alloc_name_ids, dtype=np.int64),
+        "cat_names": list(cat_lookup),
+        "person_names": list(person_lookup),
+        "month_lookup": month_lookup,
+    }
+    _flat_cache = (data, flat)
+    return flat
+
+
+def _grouped_sums(keys, weights) -> dict:
+    """Sum `weights` grouped by `keys` (object array) via unique + bincount."""
+    if len(keys) == 0:
+        return {}
+    uniq, inv = np.unique(keys, return_inverse=True)
+    sums = np.bincount(inv, weights=weights)
+    return dict(zip(uniq.tolist(), sums.tolist()))
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _agg_kernel(amounts, cat_ids, person_ids, month_ids, has_alloc,
+                    alloc_entry, alloc_amounts, alloc_name_ids,
+                    target_id, n_cats, n_persons):
+        """Single compiled pass accumulating per-category/payer/beneficiary
+        sums into flat buffers; `*_seen` marks ids that occurred in the
+        target month so only those become dict keys afterwards."""
+        per_cat = np.zeros(n_cats, dtype=np.float64)
+        per_payer = np.zeros(n_persons, dtype=np.float64)
+        per_benef = np.zeros(n_persons, dtype=np.float64)
+        cat_seen = np.zeros(n_cats, dtype=np.bool_)
+        payer_seen = np.zeros(n_persons, dtype=np.bool_)
+        benef_seen = np.zeros(n_persons, dtype=np.bool_)
+
+        for i in range(amounts.shape[0]):
+            if month_ids[i] != target_id:
+                continue
+            signed = -amounts[i]
+            c = cat_ids[i]
+            p = person_ids[i]
+            per_cat[c] += signed
+            cat_seen[c] = True
+            per_payer[p] += signed
+            payer_seen[p] = True
+            if not has_alloc[i]:
+                per_benef[p] += signed
+                benef_seen[p] = True
+
+        for j in range(alloc_amounts.shape[0]):
+            if month_ids[alloc_entry[j]] != target_id:
+                continue
+            b = alloc_name_ids[j]
+            per_benef[b] -= alloc_amounts[j]
+            benef_seen[b] = True
+
+        return per_cat, per_payer, per_benef, cat_seen, payer_seen, benef_seen
+
+
+def _breakdown_vectorized(flat, month: str):
+    mask = flat["months"] == month
+
+    if njit is not None:
+        target_id = flat["month_lookup"].get(month, -1)
+        cat_buf, payer_buf, benef_buf, cat_seen, payer_seen, benef_seen = _agg_kernel(
+            flat["amounts"], flat["cat_ids"], flat["person_ids"], flat["month_ids"],
+            flat["has_alloc"], flat["alloc_entry"], flat["alloc_amounts"],
+            flat["alloc_name_ids"], target_id,
+            len(flat["cat_names"]), len(flat["person_names"]),
+        )
+        per_category = {n: float(cat_buf[i]) for i, n in enumerate(flat["cat_names"]) if cat_seen[i]}
+        per_payer = {n: float(payer_buf[i]) for i, n in enumerate(flat["person_names"]) if payer_seen[i]}
+        per_beneficiary = {n: float(benef_buf[i]) for i, n in enumerate(flat["person_names"]) if benef_seen[i]}
+    else:
+        signed = -flat["amounts"][mask]  # expense (negative in data) -> + ; income (positive) -> -
+        per_category = _grouped_sums(flat["categories"][mask], signed)
+        per_payer = _grouped_sums(flat["payers"][mask], signed)
+
+        # beneficiaries: allocations of masked entries, plus the payer for
+        # entries without allocations (same signed convention)
+        alloc_in = mask[flat["alloc_entry"]] if len(flat["alloc_entry"]) else np.zeros(0, dtype=bool)
+        per_beneficiary = _grouped_sums(flat["alloc_names"][alloc_in], -flat["alloc_amounts"][alloc_in])
+        no_alloc = mask & ~flat["has_alloc"]
+        for payer, v in _grouped_sums(flat["payers"][no_alloc], -flat["amounts"][no_alloc]).items():
+            per_beneficiary[payer] = per_beneficiary.get(payer, 0.0) + v
+
+    # optional consistency check (does not affect totals)
+    if DEBUG_CONSISTENCY:
+        bad = np.flatnonzero(mask & flat["has_alloc"] & (np.abs(flat["alloc_sums"] - flat["amounts"]) > 1e-6))
+        for i in bad:
+            print(f"⚠️  Warning: allocations ({flat['alloc_sums'][i]}) != entry amount ({flat['amounts'][i]}) for ID={flat['ids'][i]}")
+
+    expenses = incomes = 0.0
+    for v in per_category.values():
+        if v > 0:
+            expenses += v
+        else:
+            incomes -= v
+
+    totals = {"expenses": float(expenses), "incomes": float(incomes), "net": float(expenses - incomes)}
+    return per_category, totals, per_beneficiary, per_payer
+
+
 def expenses_for_month_breakdown(data, month: str):
     """
-    Compute NET amounts for a given month (YYYY-MM):
+    Compute NET amounts for a given month (YYYY-MM).
+
+    `data` is either the raw json dict or a TricountAPI instance; passing
+    the instance lets repeated calls reuse its per-month entry index
+    instead of scanning the whole registry each time.
+
+    Returns:
       - per_category: {category: net_amount}  (signed = -amount; expense -> +, income -> -)
       - totals: {"expenses": sum of expenses +, "incomes": sum of incomes +, "net": expenses - incomes}
       - per_beneficiary: {person: net_amount}
@@ -56,66 +311,134 @@ def expenses_for_month_breakdown(data, month: str):
       - Monthly totals are derived ONLY from per_category (not from allocations) to avoid double counting.
       - Allocations are used only to distribute amounts across people (same signed convention).
     """
-    per_category = defaultdict(float)
-    per_beneficiary = defaultdict(float)
-    per_payer = defaultdict(float)
+    return expenses_for_months(data, (month,))[month]
 
-    response = data.get("Response", [])
-    if not response:
-        return {}, {"expenses": 0.0, "incomes": 0.0, "net": 0.0}, {}, {}
 
-    entries = response[0].get("Registry", {}).get("all_registry_entry", []) or []
+def expenses_for_months(data, months):
+    """
+    Compute the breakdown of expenses_for_month_breakdown for several
+    months ("YYYY-MM" each) in a single scan of the registry.
+
+    Returns {month: (per_category, totals, per_beneficiary, per_payer)}.
+    """
+    api = None
+    if hasattr(data, "get_month_entries"):  # TricountAPI handle
+        api = data
+        data = api.get_data()
+
+    months = list(months)
+
+    if np is not None:
+        flat = _flatten_entries(data)
+        return {month: _breakdown_vectorized(flat, month) for month in months}
+
+    target_months = set(months)
+
+    # aggregated over all requested months at once, keyed by (month, name);
+    # plain dicts with a pre-bound .get beat defaultdict's __missing__
+    # dispatch for the handful of distinct keys a tricount has
+    per_category = {}
+    per_beneficiary = {}
+    per_payer = {}
+    pc_get = per_category.get
+    pb_get = per_beneficiary.get
+    pp_get = per_payer.get
+
+    # bind hot-path helpers and builtins to locals (LOAD_FAST vs LOAD_GLOBAL)
+    _amt = _get_amount
+    _name = _get_display_name
+    _abs = abs
+    _dbg = DEBUG_CONSISTENCY
+
+    if api is not None:
+        entries = [wrapper for month in months for wrapper in api.get_month_entries(month)]
+    else:
+        response = data.get("Response", [])
+        if response:
+            entries = response[0].get("Registry", {}).get("all_registry_entry", []) or []
+        else:
+            entries = []
 
     for wrapper in entries:
-        entry = (wrapper or {}).get("RegistryEntry", {}) or {}
+        entry = wrapper.get("RegistryEntry") if wrapper else None
+        if not entry:
+            continue
 
         # consider ACTIVE entries only
         if entry.get("status") and entry["status"] != "ACTIVE":
             continue
 
-        # date filter -> only target month
-        dt = _parse_date(entry.get("date"))
-        if not dt or dt.strftime("%Y-%m") != month:
+        # date filter -> requested months only
+        # dates are ISO-8601 ("YYYY-MM-DD ..."), so a prefix compare avoids
+        # strptime/strftime per row; fall back to full parsing for odd formats
+        date_str = entry.get("date") or ""
+        month = date_str[:7]
+        if not (len(month) == 7 and month[4] == "-" and month[:4].isdigit() and month[5:].isdigit()):
+            dt = _parse_date(date_str)
+            month = dt.strftime("%Y-%m") if dt else ""
+        if month not in target_months:
             continue
 
         # amount (prefer local) and unified sign convention
-        amount_val = _get_amount(entry)
+        amount_val = _amt(entry)
         if amount_val == 0:
             continue
         signed = -amount_val  # expense (negative in data) -> + ; income (positive) -> -
 
         # category (prefer custom)
         category = entry.get("category_custom") or entry.get("category") or "Unbekannt"
-        per_category[category] += signed
+        key = (month, category)
+        per_category[key] = pc_get(key, 0.0) + signed
 
         # payer
-        payer = _get_display_name(entry.get("membership_owned", {}))
-        per_payer[payer] += signed
+        payer = _name(entry.get("membership_owned"))
+        key = (month, payer)
+        per_payer[key] = pp_get(key, 0.0) + signed
 
         # beneficiaries via allocations (distribution only)
-        allocations = entry.get("allocations", []) or []
+        allocations = entry.get("allocations") or ()
         if allocations:
             alloc_sum = 0.0
             for alloc in allocations:
-                a = _get_amount(alloc)
+                a = _amt(alloc)
                 alloc_sum += a
                 if a == 0:
                     continue
-                per_beneficiary[_get_display_name(alloc.get("membership", {}))] += -a  # same signed convention
+                key = (month, _name(alloc.get("membership")))
+                per_beneficiary[key] = pb_get(key, 0.0) - a  # same signed convention
             # optional consistency check (does not affect totals)
-            if abs(alloc_sum - amount_val) > 1e-6:
+            if _dbg and _abs(alloc_sum - amount_val) > 1e-6:
                 print(f"⚠️  Warning: allocations ({alloc_sum}) != entry amount ({amount_val}) for ID={entry.get('id')}")
         else:
             # no allocations -> assign full signed amount to payer as beneficiary
-            per_beneficiary[payer] += signed
-
-    # derive monthly totals exclusively from per_category
-    expenses = sum(v for v in per_category.values() if v > 0)   # expenses (positive)
-    incomes  = sum(-v for v in per_category.values() if v < 0)  # incomes (positive)
-    net      = sum(per_category.values())                        # net
-
-    totals = {"expenses": float(expenses), "incomes": float(incomes), "net": float(net)}
-    return dict(per_category), totals, dict(per_beneficiary), dict(per_payer)
+            key = (month, payer)
+            per_beneficiary[key] = pb_get(key, 0.0) + signed
+
+    # split the combined maps back into per-month dicts
+    cats_by_month = {month: {} for month in months}
+    benef_by_month = {month: {} for month in months}
+    payer_by_month = {month: {} for month in months}
+    for (month, category), v in per_category.items():
+        cats_by_month[month][category] = v
+    for (month, person), v in per_beneficiary.items():
+        benef_by_month[month][person] = v
+    for (month, person), v in per_payer.items():
+        payer_by_month[month][person] = v
+
+    results = {}
+    for month in months:
+        # derive monthly totals exclusively from per_category (single pass)
+        expenses = incomes = 0.0
+        for v in cats_by_month[month].values():
+            if v > 0:
+                expenses += v   # expenses (positive)
+            else:
+                incomes -= v    # incomes (positive)
+
+        totals = {"expenses": float(expenses), "incomes": float(incomes), "net": float(expenses - incomes)}
+        results[month] = (cats_by_month[month], totals, benef_by_month[month], payer_by_month[month])
+
+    return results
 
 
 # ------------------------
@@ -133,15 +456,13 @@ if __name__ == "__main__":
     except Exception:
         pass
 
-    data = trapi.get_data()
-
     target_month = "2025-07"  # <<< set your desired month here
 
-    per_category, totals, per_person, per_payer = expenses_for_month_breakdown(data, target_month)
+    per_category, totals, per_person, per_payer = trapi.breakdown(target_month)
 
     print(f"=== Net per category for {target_month} ===")
     # Note: values can be negative if incomes > expenses in a category.
-    for cat, total in sorted(per_category.items(), key=lambda x: x[1], reverse=True):
+    for cat, total in sorted(per_category.items(), key=itemgetter(1), reverse=True):
         print(f"{cat}: {total:.2f} {CURRENCY}")
 
     print(f"\n=== Monthly totals ({target_month}) ===")
@@ -150,9 +471,9 @@ if __name__ == "__main__":
     print(f"Net:      {totals['net']:.2f} {CURRENCY}")
 
     print(f"\n=== Net per person (Beneficiary) for {target_month} ===")
-    for person, total in sorted(per_person.items(), key=lambda x: x[1], reverse=True):
+    for person, total in sorted(per_person.items(), key=itemgetter(1), reverse=True):
         print(f"{person}: {total:.2f} {CURRENCY}")
 
     print(f"\n=== Net per payer (Payer) for {target_month} ===")
-    for person, total in sorted(per_payer.items(), key=lambda x: x[1], reverse=True):
+    for person, total in sorted(per_payer.items(), key=itemgetter(1), reverse=True):
         print(f"{person}: {total:.2f} {CURRENCY}")
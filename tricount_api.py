@@ -1,7 +1,29 @@
+import json
 import requests
+import time
 import uuid
 import os
 
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; stdlib json decoding is used without it
+    orjson = None
+
+try:
+    import httpx
+except ImportError:
+    # httpx is optional; requests is used without it
+    httpx = None
+
+try:
+    import ijson
+except ImportError:
+    # ijson is optional; without it the registry body is buffered in full
+    ijson = None
+
 from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.primitives import serialization
 from dotenv import load_dotenv
@@ -12,6 +34,12 @@ import warnings
 class TricountAPI():
     load_dotenv()
     APP_ID = os.getenv("APP_ID")
+
+    # on-disk session cache, keyed by app installation ID; avoids repeating
+    # the auth roundtrip on every run (only useful with a fixed app_id)
+    CACHE_DIR = os.path.expanduser("~/.cache/tricount_api")
+    SESSION_CACHE_TTL = 24 * 3600  # seconds; stale tokens also trigger re-auth
+
     def __init__(self, tricount_key: str, app_id=APP_ID) -> None:
 
         self.base_url = "https://api.tricount.bunq.com"
@@ -21,8 +49,38 @@ class TricountAPI():
 
         self.session = self.__create_session()
 
-        # load the tricount data at init
-        self.data = self.__requests_json()
+        # kick off the tricount data load in the background; the first
+        # access to `data` blocks on the result
+        self._data = None
+        self._data_future = None
+        self.__fetch_data_async()
+
+        # lazy index: "YYYY-MM" -> indices into all_registry_entry
+        self._month_index = None
+
+        # memoized month breakdowns, cleared on update_data()
+        self._breakdown_cache = {}
+
+    def __fetch_data_async(self) -> None:
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        self._data_future = executor.submit(self.__requests_json)
+        executor.shutdown(wait=False)
+
+    @property
+    def data(self) -> dict:
+
+        if self._data_future is not None:
+            self._data = self._data_future.result()
+            self._data_future = None
+
+        return self._data
+
+    @data.setter
+    def data(self, value: dict) -> None:
+
+        self._data = value
+        self._data_future = None
 
     def __generate_installation_id(self, app_id: str) -> str:
 
@@ -40,7 +98,26 @@ class TricountAPI():
 
     def __generate_rsa_key(self) -> str:
 
-        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        # reuse the keypair cached for this installation if possible; key
+        # generation is the most expensive step of construction (~50-200ms)
+        private_key = None
+
+        private_key_pem = self.__load_cache().get('private_key_pem')
+        if private_key_pem:
+            try:
+                private_key = serialization.load_pem_private_key(
+                    private_key_pem.encode('utf-8'), password=None)
+            except (ValueError, TypeError):
+                private_key = None
+
+        if private_key is None:
+            private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+            self.__update_cache(private_key_pem=private_key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption()
+            ).decode('utf-8'))
+
         public_key = private_key.public_key()
         rsa_public_key_pem = public_key.public_bytes(
             encoding=serialization.Encoding.PEM,
@@ -49,7 +126,7 @@ class TricountAPI():
 
         return rsa_public_key_pem
 
-    def __create_session(self) -> requests.Session:
+    def __create_session(self):
 
         headers = {
             "User-Agent": "com.bunq.tricount.android:RELEASE:7.0.7:3174:ANDROID:13:C",
@@ -57,6 +134,16 @@ class TricountAPI():
             "X-Bunq-Client-Request-Id": "049bfcdf-6ae4-4cee-af7b-45da31ea85d0"
         }
 
+        # prefer httpx so the auth POST and registry GET share one
+        # multiplexed HTTP/2 connection instead of paying a second TLS
+        # handshake; requests remains the default backend
+        if httpx is not None:
+            try:
+                return httpx.Client(http2=True, headers=headers)
+            except ImportError:
+                # the h2 extra is not installed
+                return httpx.Client(headers=headers)
+
         session = requests.Session()
         session.headers.update(headers)
 
@@ -74,23 +161,107 @@ class TricountAPI():
         # Make the authentication request
         response = self.session.post(f"{self.base_url}/v1/session-registry-installation", json=payload)
 
+        return self.__decode_json(response)
+
+    @staticmethod
+    def __decode_json(response) -> dict:
+
+        # orjson parses the large registry payload considerably faster than
+        # the stdlib decoder behind response.json()
+        if orjson is not None:
+            return orjson.loads(response.content)
+
         return response.json()
 
+    def __cache_path(self) -> str:
+
+        return os.path.join(self.CACHE_DIR, f'{self.app_installation_id}.json')
+
+    def __load_cache(self) -> dict:
+
+        try:
+            with open(self.__cache_path()) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def __update_cache(self, **fields) -> None:
+
+        cached = self.__load_cache()
+        cached.update(fields)
+
+        # atomic write so a crashed run never leaves a truncated cache file;
+        # the file holds the private key and auth token, so keep both the
+        # directory and the file owner-only
+        try:
+            os.makedirs(self.CACHE_DIR, mode=0o700, exist_ok=True)
+            tmp_path = f'{self.__cache_path()}.tmp'
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as file:
+                json.dump(cached, file)
+            os.replace(tmp_path, self.__cache_path())
+        except OSError:
+            pass
+
+    def __load_cached_session(self) -> dict:
+
+        # the keypair never expires with the token, so only the auth fields
+        # are gated on expires_at
+        cached = self.__load_cache()
+
+        if not cached.get('auth_token') or cached.get('expires_at', 0) <= time.time():
+            return {}
+
+        return cached
+
+    def __get_registry(self, auth_token: str, user_id):
+
+        self.session.headers.update({'X-Bunq-Client-Authentication': auth_token})
+
+        url = f'{self.base_url}/v1/user/{user_id}/registry?public_identifier_token={self.tricount_key}'
+
+        # with requests + ijson, stream the body so it is parsed incrementally
+        # instead of buffering the whole payload next to the decoded tree
+        if ijson is not None and isinstance(self.session, requests.Session):
+            return self.session.get(url, stream=True)
+
+        return self.session.get(url)
+
+    def __decode_registry(self, response) -> dict:
+
+        # the registry payload is by far the largest response this wrapper
+        # sees; peak memory matters more than parse speed here
+        raw = getattr(response, 'raw', None)
+        if ijson is not None and raw is not None:
+            raw.decode_content = True  # let urllib3 handle gzip on the fly
+            return next(ijson.items(raw, ''), {})
+
+        return self.__decode_json(response)
+
     def __requests_json(self) -> dict:
 
+        # Reuse a cached auth token if one is still valid, skipping the
+        # authentication roundtrip entirely
+        cached = self.__load_cached_session()
+        if cached:
+            tricount_data = self.__get_registry(cached['auth_token'], cached['user_id'])
+            # status check spelled to work with both requests and httpx
+            if tricount_data.status_code < 400:
+                return self.__decode_registry(tricount_data)
+            # cached token rejected by the API -> fall through to fresh auth
+
         # Make authentification requests to have auth token and user ID
         auth_response = self.__auth_requests()
         auth_token = auth_response['Response'][1]['Token']['token']
         user_id = auth_response['Response'][3]['UserPerson']['id']
 
-        # Update the headers to include auth token
-        self.session.headers.update({'X-Bunq-Client-Authentication': auth_token})
+        self.__update_cache(auth_token=auth_token, user_id=user_id,
+                            expires_at=time.time() + self.SESSION_CACHE_TTL)
 
         # Requests tricount data
-        tricount_data = self.session.get(
-            f'{self.base_url}/v1/user/{user_id}/registry?public_identifier_token={self.tricount_key}')
+        tricount_data = self.__get_registry(auth_token, user_id)
 
-        return tricount_data.json()
+        return self.__decode_registry(tricount_data)
 
     def update_data(self) -> None:
 
@@ -98,7 +269,69 @@ class TricountAPI():
         Requests to tricount API and update the current data
         """
 
-        self.data = self.__requests_json()
+        # a fetch started by the constructor may still be in flight; consume
+        # its result instead of racing a second request on the shared session
+        # (requests.Session and the cache file are not safe for concurrent use)
+        if self._data_future is not None:
+            future, self._data_future = self._data_future, None
+            self._data = future.result()
+        else:
+            self._data = self.__requests_json()
+
+        self._month_index = None
+        self._breakdown_cache = {}
+
+    def __registry_entries(self) -> list:
+
+        try:
+            return self.data['Response'][0]['Registry']['all_registry_entry'] or []
+        except (KeyError, IndexError, TypeError):
+            return []
+
+    def __build_month_index(self) -> dict:
+
+        # bucket entries once by the "YYYY-MM" prefix of their ISO date, so
+        # month queries only touch the relevant rows
+        index = {}
+
+        for i, wrapper in enumerate(self.__registry_entries()):
+            entry = (wrapper or {}).get('RegistryEntry', {}) or {}
+            date = entry.get('date') or ''
+            index.setdefault(date[:7], []).append(i)
+
+        return index
+
+    def get_month_entries(self, month: str) -> list:
+
+        """
+        Returns the registry entry wrappers whose date falls in the given
+        month ("YYYY-MM"). The underlying index is built once per data load.
+        """
+
+        if self._month_index is None:
+            self._month_index = self.__build_month_index()
+
+        entries = self.__registry_entries()
+
+        return [entries[i] for i in self._month_index.get(month, [])]
+
+    def breakdown(self, month: str) -> tuple:
+
+        """
+        Returns the (per_category, totals, per_beneficiary, per_payer)
+        breakdown for the given month ("YYYY-MM"). Results are memoized
+        until the next update_data(), so dashboards rendering the same
+        month repeatedly pay the aggregation cost once.
+        """
+
+        cached = self._breakdown_cache.get(month)
+
+        if cached is None:
+            # imported lazily to avoid a circular module import
+            from main import expenses_for_month_breakdown
+            cached = self._breakdown_cache[month] = expenses_for_month_breakdown(self, month)
+
+        return cached
 
     def get_data(self) -> dict:
 
@@ -131,25 +364,75 @@ class TricountAPI():
         Returns a list of all expenses, can be filtered by user
         """
 
+        # dispatch to a specialized loop so the per-entry work carries no
+        # user_id branching or repeated int() conversion
+        if user_id:
+            return self.__user_expenses(int(user_id))
+
+        return self.__total_expenses()
+
+    def __total_expenses(self) -> list:
+
         expenses = []
 
-        for expense in self.data['Response'][0]['Registry']['all_registry_entry']:
+        for expense in self.__registry_entries():
 
             entry = expense['RegistryEntry']
-            amount = float(entry['amount']['value'])
 
             # skip refunds
             if entry['type_transaction'] == 'BALANCE':
                 continue
 
-            # filter by user if user ID is provided
-            if user_id:
-                amount = None
-                for allocation in entry['allocations']:
-                    if allocation['membership']['RegistryMembershipNonUser']['id'] == int(user_id):
-                        amount = float(allocation['amount']['value'])
+            expenses.append(float(entry['amount']['value']))
+
+        return expenses
+
+    def __user_expenses(self, user_id: int) -> list:
+
+        expenses = []
+
+        for expense in self.__registry_entries():
+
+            entry = expense['RegistryEntry']
+
+            # skip refunds
+            if entry['type_transaction'] == 'BALANCE':
+                continue
+
+            amount = None
+            for allocation in entry['allocations']:
+                if allocation['membership']['RegistryMembershipNonUser']['id'] == user_id:
+                    amount = float(allocation['amount']['value'])
 
             if amount is not None:
                 expenses.append(amount)
 
         return expenses
+
+    def get_all_expenses_grouped(self) -> tuple:
+
+        """
+        Returns (all_expenses, expenses_by_user) in a single pass over the
+        registry: a list of all expense amounts plus a dict mapping user IDs
+        to their allocated amounts. Equivalent to calling get_expenses()
+        once per user, without re-scanning the entries for each user.
+        """
+
+        all_expenses = []
+        by_user = {}
+
+        for expense in self.__registry_entries():
+
+            entry = expense['RegistryEntry']
+
+            # skip refunds
+            if entry['type_transaction'] == 'BALANCE':
+                continue
+
+            all_expenses.append(float(entry['amount']['value']))
+
+            for allocation in entry['allocations']:
+                user_id = str(allocation['membership']['RegistryMembershipNonUser']['id'])
+                by_user.setdefault(user_id, []).append(float(allocation['amount']['value']))
+
+        return all_expenses, by_user